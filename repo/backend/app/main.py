@@ -1,11 +1,18 @@
-from fastapi import FastAPI
-from app.routers import health, ingest, plan, solve, critic, apply, learn
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import ORJSONResponse
+from app.routers import health, ingest, plan, solve, critic, apply, learn, pipeline
+from app.services_redis import close_redis
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    close_redis()
+
+api = APIRouter(prefix="/api")
+for module in (ingest, plan, solve, critic, apply, learn, pipeline):
+    api.include_router(module.router)
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 app.include_router(health.router, prefix="/healthz")
-app.include_router(ingest.router, prefix="/api")
-app.include_router(plan.router, prefix="/api")
-app.include_router(solve.router, prefix="/api")
-app.include_router(critic.router, prefix="/api")
-app.include_router(apply.router, prefix="/api")
-app.include_router(learn.router, prefix="/api")
+app.include_router(api)
@@ -1,32 +1,36 @@
 from fastapi import APIRouter, Header, Query
-from pydantic import BaseModel
-from typing import List
-from app.services_idempotency import is_duplicate_request, remember_request
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List
+import operator
+from app.services_idempotency import claim_request
 
 class ProposedEvent(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     start_dt: str
     end_dt: str
 
 class ApplyReq(BaseModel):
-    events: List[ProposedEvent]
+    events: Annotated[List[ProposedEvent], Field(max_length=1000)]
 
 class ApplyRes(BaseModel):
     diff: List[str]
     receipts: List[str]
 
+_EVENT_FIELDS = operator.attrgetter("task_id", "start_dt", "end_dt")
+
 router = APIRouter()
 
 @router.post("/apply", response_model=ApplyRes)
 def apply(req: ApplyReq, dry_run: bool = Query(default=True), x_idempotency_key: str | None = Header(default=None)):
     key = x_idempotency_key or "no-key"
-    if not dry_run and is_duplicate_request(key):
+    if not dry_run and not claim_request(key):
         return {"diff": [], "receipts": ["idempotent:no-op"]}
-    diff = [f"ADD {e.task_id} {e.start_dt}->{e.end_dt}" for e in req.events]
+    diff = [f"ADD {tid} {s}->{e}" for tid, s, e in map(_EVENT_FIELDS, req.events)]
     receipts: list[str] = []
     if not dry_run:
-        remember_request(key)
-        receipts = [f"google:{i}" for i,_ in enumerate(req.events)]
+        receipts = [f"google:{i}" for i in range(len(req.events))]
     return {"diff": diff, "receipts": receipts}
 
 
@@ -1,40 +1,95 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, TypeAdapter, Field
+from typing import Annotated, List, Optional
+from datetime import datetime, timezone
+import heapq
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class ProposedEvent(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     start_dt: str
     end_dt: str
 
 class FixedEvent(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: str
     start_dt: str
     end_dt: str
 
 class CriticReq(BaseModel):
-    proposed_events: List[ProposedEvent]
-    fixed_events: List[FixedEvent]
+    proposed_events: Annotated[List[ProposedEvent], Field(max_length=1000)]
+    fixed_events: Annotated[List[FixedEvent], Field(max_length=1000)]
 
 class CriticRes(BaseModel):
     approve: bool
     replan_request: Optional[dict] = None
     violations: List[str] = []
 
+PROPOSED_EVENTS = TypeAdapter(List[ProposedEvent])
+FIXED_EVENTS = TypeAdapter(List[FixedEvent])
+
 router = APIRouter()
 
+def _to_utc_naive(s: str) -> datetime:
+    dt = datetime.fromisoformat(s)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def _parse_iso_array(strs: List[str]) -> "np.ndarray":
+    # numpy only parses offset-free ISO strings cleanly, so normalise to UTC first
+    return np.array([_to_utc_naive(s) for s in strs], dtype="datetime64[ns]").view("i8")
+
+def _overlap_pairs(ps: list, pe: list, fs: list, fe: list) -> list[tuple[int, int]]:
+    if len(ps) * len(fs) < 10_000:
+        return [(i, j) for i in range(len(ps)) for j in range(len(fs)) if pe[i] > fs[j] and ps[i] < fe[j]]
+    # Sweep-line over interval starts: each overlapping pair is reported once,
+    # when the later of the two starts, against the other side's active set.
+    starts = sorted([(s, 0, i) for i, s in enumerate(ps)] + [(s, 1, j) for j, s in enumerate(fs)])
+    active_p: list = []
+    active_f: list = []
+    pairs = []
+    for t, kind, k in starts:
+        while active_p and active_p[0][0] <= t:
+            heapq.heappop(active_p)
+        while active_f and active_f[0][0] <= t:
+            heapq.heappop(active_f)
+        if kind == 0:
+            pairs.extend((k, j) for _, j in active_f if pe[k] > fs[j])
+            heapq.heappush(active_p, (pe[k], k))
+        else:
+            pairs.extend((i, k) for _, i in active_p if fe[k] > ps[i])
+            heapq.heappush(active_f, (fe[k], k))
+    return sorted(pairs)
+
 @router.post("/critic", response_model=CriticRes)
 def critic(req: CriticReq):
     violations: list[str] = []
-    for pe in req.proposed_events:
-        ps = datetime.fromisoformat(pe.start_dt)
-        pe_ = datetime.fromisoformat(pe.end_dt)
-        for fe in req.fixed_events:
-            fs = datetime.fromisoformat(fe.start_dt)
-            fe_ = datetime.fromisoformat(fe.end_dt)
-            if not (pe_ <= fs or ps >= fe_):
-                violations.append(f"overlap:{pe.task_id}:{fe.id}")
+    if req.proposed_events and req.fixed_events:
+        p_ids = [e.task_id for e in req.proposed_events]
+        f_ids = [e.id for e in req.fixed_events]
+        if np is not None:
+            ps_arr = _parse_iso_array([e.start_dt for e in req.proposed_events])
+            pe_arr = _parse_iso_array([e.end_dt for e in req.proposed_events])
+            fs_arr = _parse_iso_array([e.start_dt for e in req.fixed_events])
+            fe_arr = _parse_iso_array([e.end_dt for e in req.fixed_events])
+            overlap = (pe_arr[:, None] > fs_arr[None, :]) & (ps_arr[:, None] < fe_arr[None, :])
+            pairs = np.argwhere(overlap)
+        else:
+            pairs = _overlap_pairs(
+                [_to_utc_naive(e.start_dt) for e in req.proposed_events],
+                [_to_utc_naive(e.end_dt) for e in req.proposed_events],
+                [_to_utc_naive(e.start_dt) for e in req.fixed_events],
+                [_to_utc_naive(e.end_dt) for e in req.fixed_events],
+            )
+        violations = [f"overlap:{p_ids[i]}:{f_ids[j]}" for i, j in pairs]
     approve = len(violations) == 0
     return {"approve": approve, "replan_request": None if approve else {"reason":"overlap","hints":["adjust windows"]}, "violations": violations}
 
@@ -5,6 +5,9 @@ import re
 
 router = APIRouter()
 
+# Durations and energy keywords in one scan; the two alternatives can't overlap.
+_TOKENS = re.compile(r"(?P<n>\d+)\s*(?P<unit>h(?:rs?|ours?)?|m(?:in(?:utes)?)?)|\b(?P<e>deep|light)\b", re.I)
+
 class IngestReq(BaseModel):
     raw_input: str
 
@@ -15,12 +18,21 @@ class IngestRes(BaseModel):
 def ingest(req: IngestReq):
     text = req.raw_input.strip()
     dur = None
-    m = re.search(r"(\d+)\s*(m|min|minutes|h|hr|hours)", text, re.I)
-    if m:
-        val = int(m.group(1))
-        dur = val * 60 if m.group(2).lower().startswith("h") else val
-    energy = "deep" if re.search(r"\bdeep\b", text, re.I) else ("light" if re.search(r"\blight\b", text, re.I) else None)
-    title = re.sub(r"(\d+\s*(m|min|minutes|h|hr|hours))|\bdeep\b|\blight\b", "", text, flags=re.I).strip()
+    energy = None
+    title = text
+    # Walk matches right to left so cutting a span leaves earlier spans in place.
+    for m in reversed(list(_TOKENS.finditer(text))):
+        if m.group("e"):
+            # deep wins over light wherever it appears
+            if energy != "deep":
+                energy = m.group("e").lower()
+        else:
+            # the first duration in the text counts
+            val = int(m.group("n"))
+            dur = val * 60 if m.group("unit").lower().startswith("h") else val
+        a, b = m.span()
+        title = title[:a] + title[b:]
+    title = title.strip()
     tasks = [{
         "id": "t_ingest_1",
         "user_id": "u_demo",
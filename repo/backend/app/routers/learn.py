@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import Dict, Any
+from app.services_weights import update_weight
 
 class LearnReq(BaseModel):
     telemetry: Dict[str, Any]
@@ -13,9 +14,8 @@ router = APIRouter()
 
 @router.post("/learn", response_model=LearnRes)
 def learn(req: LearnReq):
-    weights = {"deep_work_morning": 0.5}
     observed = req.telemetry.get("observed", 1)
-    new = 0.8 * weights.get("deep_work_morning", 0.5) + 0.2 * float(observed)
+    new = update_weight("deep_work_morning", float(observed))
     return {"updated_weights": {"deep_work_morning": new}, "rationale": "EWMA update"}
 
 
@@ -0,0 +1,39 @@
+import asyncio
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+from typing import Annotated, List
+from app.routers import ingest, plan, solve, critic
+
+class FixedEvent(BaseModel):
+    id: str
+    start_dt: str
+    end_dt: str
+
+class PipelineReq(BaseModel):
+    raw_input: str
+    fixed_events: Annotated[List[FixedEvent], Field(max_length=1000)] = []
+    prefs: dict | None = None
+
+class PipelineRes(BaseModel):
+    tasks: List[dict]
+    planned_tasks: List[plan.PlannedTask]
+    proposed_events: List[solve.ProposedEvent]
+    critic: critic.CriticRes
+
+router = APIRouter()
+
+# ingest -> plan -> solve -> critic as in-process calls, one round trip for the agent loop.
+# plan (cached, so it touches Redis) and critic (NumPy over up to 1000x1000 pairs)
+# block, so they run in worker threads like solve does.
+@router.post("/pipeline", response_model=PipelineRes)
+async def pipeline(req: PipelineReq):
+    fixed = [f.model_dump() for f in req.fixed_events]
+    tasks = ingest.ingest(ingest.IngestReq(raw_input=req.raw_input))["tasks"]
+    planned = (await asyncio.to_thread(plan.plan, plan.PlanReq(tasks=tasks, prefs=req.prefs)))["planned_tasks"]
+    proposed = (await solve.solve(solve.SolveReq(planned_tasks=planned, fixed_events=fixed)))["proposed_events"]
+    # Lists are validated once by the prebuilt adapters; skip re-validating them in CriticReq.
+    verdict = await asyncio.to_thread(critic.critic, critic.CriticReq.model_construct(
+        proposed_events=critic.PROPOSED_EVENTS.validate_python(proposed),
+        fixed_events=critic.FIXED_EVENTS.validate_python(fixed),
+    ))
+    return {"tasks": tasks, "planned_tasks": planned, "proposed_events": proposed, "critic": verdict}
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Annotated, List
+from app.services_cache import cache_response
 
 router = APIRouter()
 
@@ -15,7 +16,7 @@ class TaskIn(BaseModel):
     latest_end_dt: str | None = None
 
 class PlanReq(BaseModel):
-    tasks: List[TaskIn]
+    tasks: Annotated[List[TaskIn], Field(max_length=1000)]
     prefs: dict | None = None
 
 class PlannedTask(BaseModel):
@@ -30,6 +31,7 @@ class PlanRes(BaseModel):
     planned_tasks: List[PlannedTask]
 
 @router.post("/plan", response_model=PlanRes)
+@cache_response("plan")
 def plan(req: PlanReq):
     planned = []
     for t in req.tasks:
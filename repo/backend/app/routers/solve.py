@@ -1,20 +1,26 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Annotated, List
+import asyncio
 from app.scheduler import solve_schedule
+from app.services_cache import cache_response
 
 class PlannedTask(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     duration_min: int
 
 class FixedEvent(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: str
     start_dt: str
     end_dt: str
 
 class SolveReq(BaseModel):
-    planned_tasks: List[PlannedTask]
-    fixed_events: List[FixedEvent] = []
+    planned_tasks: Annotated[List[PlannedTask], Field(max_length=1000)]
+    fixed_events: Annotated[List[FixedEvent], Field(max_length=1000)] = []
 
 class ProposedEvent(BaseModel):
     task_id: str
@@ -26,9 +32,14 @@ class ProposedEvent(BaseModel):
 class SolveRes(BaseModel):
     proposed_events: List[ProposedEvent]
 
+PLANNED_TASKS = TypeAdapter(List[PlannedTask])
+FIXED_EVENTS = TypeAdapter(List[FixedEvent])
+
 router = APIRouter()
 
 @router.post("/solve", response_model=SolveRes)
-def solve(req: SolveReq):
-    events = solve_schedule([p.model_dump() for p in req.planned_tasks], [f.model_dump() for f in req.fixed_events], None)
+@cache_response("solve")
+async def solve(req: SolveReq):
+    # CP-SAT holds the thread for the whole search; keep it off the event loop.
+    events = await asyncio.to_thread(solve_schedule, PLANNED_TASKS.dump_python(req.planned_tasks), FIXED_EVENTS.dump_python(req.fixed_events), None)
     return {"proposed_events": events}
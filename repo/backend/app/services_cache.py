@@ -0,0 +1,80 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import threading
+import orjson
+import redis
+from cachetools import TLRUCache
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from app.services_redis import get_cache_redis
+
+CACHE_PREFIX = "tm"
+
+logger = logging.getLogger(__name__)
+
+# Fallback when REDIS_URL is unset; values are (expire, payload).
+_local: TLRUCache = TLRUCache(maxsize=1024, ttu=lambda _key, value, now: now + value[0])
+_local_lock = threading.Lock()
+
+def body_hash_key(namespace: str, req: BaseModel) -> str:
+    canonical = orjson.dumps(req.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return f"{CACHE_PREFIX}:{namespace}:{hashlib.blake2b(canonical, digest_size=16).hexdigest()}"
+
+def get_cached(key: str) -> dict | None:
+    r = get_cache_redis()
+    if r is not None:
+        # A cache outage is a miss, never a failed request.
+        try:
+            raw = r.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        return orjson.loads(raw) if raw is not None else None
+    with _local_lock:
+        hit = _local.get(key)
+    return hit[1] if hit is not None else None
+
+def set_cached(key: str, value: dict, expire: int) -> None:
+    r = get_cache_redis()
+    if r is not None:
+        try:
+            r.set(key, orjson.dumps(value), ex=expire)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache write failed: {e}")
+        return
+    with _local_lock:
+        _local[key] = (expire, value)
+
+def cache_response(namespace: str, expire: int = 300):
+    # Only for handlers that are pure functions of their request body.
+    def wrapper(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def inner_async(req: BaseModel, *args, **kwargs):
+                # Redis calls block; keep them off the event loop.
+                key = body_hash_key(namespace, req)
+                hit = await asyncio.to_thread(get_cached, key)
+                if hit is not None:
+                    return hit
+                res = jsonable_encoder(await func(req, *args, **kwargs))
+                await asyncio.to_thread(set_cached, key, res, expire)
+                return res
+            return inner_async
+
+        @functools.wraps(func)
+        def inner(req: BaseModel, *args, **kwargs):
+            key = body_hash_key(namespace, req)
+            hit = get_cached(key)
+            if hit is not None:
+                return hit
+            res = jsonable_encoder(func(req, *args, **kwargs))
+            set_cached(key, res, expire)
+            return res
+        return inner
+    return wrapper
+
+
+
@@ -1,12 +1,22 @@
-from typing import Set
+import threading
+from cachetools import TLRUCache
+from app.services_redis import get_redis
 
-_seen: Set[str] = set()
+IDEMPOTENCY_TTL_SEC = 86400
 
-def is_duplicate_request(key: str) -> bool:
-    return key in _seen
+# Fallback when REDIS_URL is unset: bounded, per-process, each key expires after its own ttl.
+_local: TLRUCache = TLRUCache(maxsize=100_000, ttu=lambda _key, ttl, now: now + ttl)
+_local_lock = threading.Lock()
 
-def remember_request(key: str) -> None:
-    _seen.add(key)
+def claim_request(key: str, ttl: int = IDEMPOTENCY_TTL_SEC) -> bool:
+    r = get_redis()
+    if r is not None:
+        return bool(r.set(f"idem:{key}", "1", nx=True, ex=ttl))
+    with _local_lock:
+        if key in _local:
+            return False
+        _local[key] = ttl
+        return True
 
 
 
@@ -0,0 +1,34 @@
+import os
+import redis
+
+_redis: redis.Redis | None = None
+_cache_redis: redis.Redis | None = None
+
+def get_redis() -> redis.Redis | None:
+    global _redis
+    url = os.environ.get("REDIS_URL")
+    if url and _redis is None:
+        _redis = redis.Redis.from_url(url)
+    return _redis
+
+def get_cache_redis() -> redis.Redis | None:
+    # Response cache lives on its own LRU-evicting instance so memory pressure
+    # never evicts idempotency keys or learned weights from REDIS_URL.
+    global _cache_redis
+    url = os.environ.get("REDIS_CACHE_URL")
+    if not url:
+        return get_redis()
+    if _cache_redis is None:
+        _cache_redis = redis.Redis.from_url(url)
+    return _cache_redis
+
+def close_redis() -> None:
+    global _redis, _cache_redis
+    for client in (_redis, _cache_redis):
+        if client is not None:
+            client.close()
+    _redis = None
+    _cache_redis = None
+
+
+
@@ -0,0 +1,36 @@
+import threading
+from app.services_redis import get_redis
+
+DEFAULT_WEIGHT = 0.5
+EWMA_ALPHA = 0.2
+
+# Read-modify-write in one script so concurrent /learn calls don't lose updates.
+_EWMA_LUA = """
+local prev = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+local alpha = tonumber(ARGV[2])
+local new = (1 - alpha) * prev + alpha * tonumber(ARGV[3])
+redis.call('SET', KEYS[1], tostring(new))
+return tostring(new)
+"""
+
+_ewma_script = None
+# Fallback when REDIS_URL is unset.
+_local: dict[str, float] = {}
+_local_lock = threading.Lock()
+
+def update_weight(name: str, observed: float) -> float:
+    global _ewma_script
+    r = get_redis()
+    if r is not None:
+        if _ewma_script is None:
+            _ewma_script = r.register_script(_EWMA_LUA)
+        # Run on the current client: close_redis() may have replaced the one
+        # the script was first registered with.
+        return float(_ewma_script(keys=[f"learn:ewma:{name}"], args=[DEFAULT_WEIGHT, EWMA_ALPHA, observed], client=r))
+    with _local_lock:
+        new = (1 - EWMA_ALPHA) * _local.get(name, DEFAULT_WEIGHT) + EWMA_ALPHA * observed
+        _local[name] = new
+        return new
+
+
+
@@ -0,0 +1,81 @@
+import asyncio
+import inspect
+import pytest
+import redis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from app import services_cache
+from app.services_cache import cache_response
+
+class EchoReq(BaseModel):
+    value: int
+
+class DownRedis:
+    def get(self, *args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    def set(self, *args, **kwargs):
+        raise redis.ConnectionError("down")
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    """Every test starts with an empty in-process cache and no Redis"""
+    monkeypatch.setattr(services_cache, "get_cache_redis", lambda: None)
+    services_cache._local.clear()
+
+def counting_handlers():
+    calls = []
+
+    @cache_response("echo")
+    def echo(req: EchoReq):
+        calls.append(req.value)
+        return {"value": req.value}
+
+    @cache_response("echo_async")
+    async def echo_async(req: EchoReq):
+        calls.append(req.value)
+        return {"value": req.value}
+
+    return calls, echo, echo_async
+
+def test_sync_miss_then_hit():
+    """Test that a repeated body is served from the cache without calling the handler"""
+    calls, echo, _ = counting_handlers()
+    
+    assert echo(EchoReq(value=1)) == {"value": 1}
+    assert echo(EchoReq(value=1)) == {"value": 1}
+    assert echo(EchoReq(value=2)) == {"value": 2}
+    assert calls == [1, 2]
+
+def test_async_miss_then_hit():
+    """Test the coroutine variant of the decorator"""
+    calls, _, echo_async = counting_handlers()
+    
+    assert inspect.iscoroutinefunction(echo_async)
+    assert asyncio.run(echo_async(EchoReq(value=1))) == {"value": 1}
+    assert asyncio.run(echo_async(EchoReq(value=1))) == {"value": 1}
+    assert calls == [1]
+
+def test_wrapped_signature_is_visible_to_fastapi():
+    """Test that FastAPI still validates the body model through functools.wraps"""
+    calls, echo, echo_async = counting_handlers()
+    app = FastAPI()
+    app.post("/echo")(echo)
+    app.post("/echo_async")(echo_async)
+    client = TestClient(app)
+    
+    assert inspect.signature(echo).parameters["req"].annotation is EchoReq
+    for path in ("/echo", "/echo_async"):
+        assert client.post(path, json={"value": 3}).json() == {"value": 3}
+        assert client.post(path, json={"value": "x"}).status_code == 422
+    assert calls == [3, 3]
+
+def test_redis_outage_falls_through_to_handler(monkeypatch):
+    """Test that cache errors are treated as misses instead of failing the request"""
+    monkeypatch.setattr(services_cache, "get_cache_redis", lambda: DownRedis())
+    calls, echo, echo_async = counting_handlers()
+    
+    assert echo(EchoReq(value=4)) == {"value": 4}
+    assert asyncio.run(echo_async(EchoReq(value=4))) == {"value": 4}
+    assert calls == [4, 4]
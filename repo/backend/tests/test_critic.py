@@ -0,0 +1,32 @@
+import random
+import pytest
+from app.routers.critic import _overlap_pairs
+
+def naive_pairs(ps, pe, fs, fe):
+    return sorted((i, j) for i in range(len(ps)) for j in range(len(fs)) if pe[i] > fs[j] and ps[i] < fe[j])
+
+def random_intervals(rng, n):
+    # Coarse grid so identical starts and touching endpoints are common
+    starts = [rng.randrange(0, 200, 5) for _ in range(n)]
+    ends = [s + rng.choice([5, 10, 15, 30]) for s in starts]
+    return starts, ends
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sweep_matches_naive_pairs(seed):
+    """Test that the sweep-line path reports exactly the naive overlap pairs"""
+    rng = random.Random(seed)
+    ps, pe = random_intervals(rng, 120)
+    fs, fe = random_intervals(rng, 100)
+    assert len(ps) * len(fs) >= 10_000  # large enough to take the sweep path
+    
+    assert _overlap_pairs(ps, pe, fs, fe) == naive_pairs(ps, pe, fs, fe)
+
+def test_sweep_touching_and_identical_starts():
+    """Test that touching intervals don't overlap and identical starts do"""
+    ps, pe = [0, 10] * 50, [10, 20] * 50
+    fs, fe = [10, 0] * 100, [20, 10] * 100
+    
+    pairs = _overlap_pairs(ps, pe, fs, fe)
+    
+    assert pairs == naive_pairs(ps, pe, fs, fe)
+    assert (0, 0) not in pairs and (0, 1) in pairs and (1, 0) in pairs
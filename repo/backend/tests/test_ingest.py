@@ -0,0 +1,25 @@
+import pytest
+from app.routers.ingest import ingest, IngestReq
+
+def ingest_one(raw_input):
+    return ingest(IngestReq(raw_input=raw_input))["tasks"][0]
+
+def test_deep_wins_and_every_keyword_is_stripped():
+    """Test that deep beats an earlier light and all keyword spans leave the title"""
+    task = ingest_one("light read, deep dive 2 hrs deep")
+    
+    assert task["energy"] == "deep"
+    assert task["duration_min"] == 120
+    assert task["title"] == "read,  dive"
+
+@pytest.mark.parametrize("raw_input, title, duration_min, energy", [
+    ("Write report 1h deep", "Write report", 60, "deep"),
+    ("call 30 minutes light", "call", 30, "light"),
+    ("review 45m then 2h", "review  then", 45, None),
+    ("plain task", "plain task", None, None),
+])
+def test_ingest_fields(raw_input, title, duration_min, energy):
+    """Test duration units, first-duration precedence and untagged input"""
+    task = ingest_one(raw_input)
+    
+    assert (task["title"], task["duration_min"], task["energy"]) == (title, duration_min, energy)
@@ -0,0 +1,23 @@
+import pytest
+from app import services_weights
+from app.services_weights import update_weight, DEFAULT_WEIGHT, EWMA_ALPHA
+
+@pytest.fixture(autouse=True)
+def local_weights(monkeypatch):
+    """Every test uses the in-process fallback with no learned weights"""
+    monkeypatch.setattr(services_weights, "get_redis", lambda: None)
+    services_weights._local.clear()
+
+def test_ewma_update_fallback():
+    """Test that each observation moves the weight by EWMA_ALPHA from its previous value"""
+    first = update_weight("deep_work_morning", 1.0)
+    second = update_weight("deep_work_morning", 1.0)
+    
+    assert first == pytest.approx((1 - EWMA_ALPHA) * DEFAULT_WEIGHT + EWMA_ALPHA)
+    assert second == pytest.approx((1 - EWMA_ALPHA) * first + EWMA_ALPHA)
+
+def test_ewma_weights_are_independent():
+    """Test that updating one weight leaves the others at the default"""
+    update_weight("deep_work_morning", 0.0)
+    
+    assert update_weight("buffer", DEFAULT_WEIGHT) == pytest.approx(DEFAULT_WEIGHT)
@@ -1,7 +1,9 @@
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Dict, Any
 from datetime import datetime, timedelta
+import numpy as np
+import os
 import pytz
 from ortools.sat.python import cp_model
 import json
@@ -36,15 +38,16 @@ class Preferences(BaseModel):
     sleep_window: str = "22:00-07:00"
     travel_speed_kmh: int = 5
     energy_profile_by_hour: Dict[str, float]
-    avoid_times: List[str]
+    avoid_times: Annotated[List[str], Field(max_length=1000)]
     weights: Dict[str, float]
 
 class SolveRequest(BaseModel):
-    tasks: List[Task]
-    fixed_events: List[FixedEvent]
+    tasks: Annotated[List[Task], Field(max_length=1000)]
+    fixed_events: Annotated[List[FixedEvent], Field(max_length=1000)]
     prefs: Preferences
     date: str
     timezone: str = "Europe/London"
+    previous_solution: Optional[Annotated[Dict[int, str], Field(max_length=1000)]] = None
 
 class ProposedEvent(BaseModel):
     task_id: int
@@ -71,7 +74,8 @@ async def solve(request: SolveRequest):
             fixed_events=request.fixed_events,
             prefs=request.prefs,
             date=request.date,
-            timezone=request.timezone
+            timezone=request.timezone,
+            previous_solution=request.previous_solution
         )
         return result
     except Exception as e:
@@ -80,10 +84,12 @@ async def solve(request: SolveRequest):
 class TaskScheduler:
     def __init__(self):
         self.slot_duration = 15
+        self.num_workers = int(os.environ.get("SOLVER_NUM_WORKERS", min(8, os.cpu_count() or 1)))
+        self.max_time_seconds = float(os.environ.get("SOLVER_MAX_SECONDS", 5.0))
         self.model = None
         self.solver = None
         
-    def solve(self, tasks, fixed_events, prefs, date, timezone):
+    def solve(self, tasks, fixed_events, prefs, date, timezone, previous_solution=None, max_seconds=None):
         tz = pytz.timezone(timezone)
         target_date = datetime.fromisoformat(date.replace('Z', '+00:00')).date()
         
@@ -91,29 +97,28 @@ class TaskScheduler:
         if not work_start or not work_end:
             return SolveResponse(proposed_events=[], unscheduled=[t.title for t in tasks], total_score=0)
         
-        start_time = datetime.combine(target_date, work_start)
-        end_time = datetime.combine(target_date, work_end)
+        start_time = tz.localize(datetime.combine(target_date, work_start))
+        end_time = tz.localize(datetime.combine(target_date, work_end))
         
         slots = self._create_time_slots(start_time, end_time)
-        fixed_slots = self._get_fixed_slots(fixed_events, slots, tz)
+        horizon = int((end_time - start_time).total_seconds() // 60)
         
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
+        self.solver.parameters.num_search_workers = self.num_workers
+        self.solver.parameters.max_time_in_seconds = self.max_time_seconds if max_seconds is None else max_seconds
+        self.solver.parameters.log_search_progress = False
         
-        task_vars = {}
-        for task in tasks:
-            task_vars[task.id] = {}
-            for i, slot in enumerate(slots):
-                var_name = f"task_{task.id}_slot_{i}"
-                task_vars[task.id][i] = self.model.NewBoolVar(var_name)
-        
-        self._add_constraints(task_vars, tasks, slots, fixed_slots, prefs)
-        self._add_objective(task_vars, tasks, slots, prefs)
+        fixed_intervals = self._get_fixed_intervals(fixed_events, start_time, horizon, tz)
+        task_slots, task_present = self._add_constraints(tasks, fixed_intervals, start_time, horizon, tz)
+        self._add_objective(task_slots, task_present, tasks, slots, prefs)
+        if previous_solution:
+            self._add_hints(task_slots, task_present, previous_solution, start_time, tz)
         
         status = self.solver.Solve(self.model)
         
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            return self._extract_solution(task_vars, tasks, slots, tz)
+            return self._extract_solution(task_slots, task_present, tasks, slots)
         else:
             return SolveResponse(
                 proposed_events=[],
@@ -142,94 +147,135 @@ class TaskScheduler:
             current += timedelta(minutes=self.slot_duration)
         return slots
     
-    def _get_fixed_slots(self, fixed_events, slots, tz):
-        fixed_slots = set()
+    def _minute_offset(self, value, start_time, tz):
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if dt.tzinfo is None:
+            dt = tz.localize(dt)
+        return int((dt - start_time).total_seconds() // 60)
+    
+    def _get_fixed_intervals(self, fixed_events, start_time, horizon, tz):
+        # Blocking events clipped to the work day and merged into disjoint runs,
+        # so double-booked meetings don't make the NoOverlap infeasible.
+        blocked = []
         for event in fixed_events:
             if not event.is_blocking:
                 continue
-                
-            start_dt = datetime.fromisoformat(event.start_dt.replace('Z', '+00:00'))
-            end_dt = datetime.fromisoformat(event.end_dt.replace('Z', '+00:00'))
             
-            for i, slot in enumerate(slots):
-                slot_start = slot
-                slot_end = slot + timedelta(minutes=self.slot_duration)
-                
-                if (start_dt <= slot_start < end_dt) or (start_dt < slot_end <= end_dt):
-                    fixed_slots.add(i)
-        
-        return fixed_slots
+            event_start = max(0, self._minute_offset(event.start_dt, start_time, tz))
+            event_end = min(horizon, self._minute_offset(event.end_dt, start_time, tz))
+            if event_start < event_end:
+                blocked.append((event_start, event_end))
+        
+        runs = []
+        for event_start, event_end in sorted(blocked):
+            if runs and event_start <= runs[-1][1]:
+                runs[-1][1] = max(runs[-1][1], event_end)
+            else:
+                runs.append([event_start, event_end])
+        
+        return [
+            self.model.NewIntervalVar(run_start, run_end - run_start, run_end, f"fixed_{i}")
+            for i, (run_start, run_end) in enumerate(runs)
+        ]
     
-    def _add_constraints(self, task_vars, tasks, slots, fixed_slots, prefs):
+    def _get_start_window(self, task, start_time, horizon, tz):
+        # Legal start slots: the task must begin at or after earliest_start_dt
+        # and finish by latest_end_dt, both clipped to the work day.
+        earliest = 0
+        latest_end = horizon
+        if task.earliest_start_dt:
+            earliest = max(0, self._minute_offset(task.earliest_start_dt, start_time, tz))
+        if task.latest_end_dt:
+            latest_end = min(horizon, self._minute_offset(task.latest_end_dt, start_time, tz))
+        
+        first_slot = -(-earliest // self.slot_duration)
+        last_slot = (latest_end - task.duration_min) // self.slot_duration
+        return first_slot, last_slot
+    
+    def _add_constraints(self, tasks, fixed_intervals, start_time, horizon, tz):
+        # Each task is an optional interval: one that can't fit (or loses out to
+        # higher-value tasks) is left unscheduled instead of making the model infeasible.
+        task_slots = {}
+        task_present = {}
+        intervals = []
+        
         for task in tasks:
-            required_slots = (task.duration_min + self.slot_duration - 1) // self.slot_duration
-            
-            self.model.Add(sum(task_vars[task.id].values()) == required_slots)
+            first_slot, last_slot = self._get_start_window(task, start_time, horizon, tz)
+            if first_slot > last_slot:
+                continue
             
-            for i, slot in enumerate(slots):
-                if i in fixed_slots:
-                    self.model.Add(task_vars[task.id][i] == 0)
-                
-                if task.earliest_start_dt:
-                    earliest = datetime.fromisoformat(task.earliest_start_dt.replace('Z', '+00:00'))
-                    if slot < earliest:
-                        self.model.Add(task_vars[task.id][i] == 0)
-                
-                if task.latest_end_dt:
-                    latest = datetime.fromisoformat(task.latest_end_dt.replace('Z', '+00:00'))
-                    if slot + timedelta(minutes=self.slot_duration) > latest:
-                        self.model.Add(task_vars[task.id][i] == 0)
-        
-        for i in range(len(slots)):
-            total_usage = sum(task_vars[task.id][i] for task in tasks)
-            self.model.Add(total_usage <= 1)
+            slot_var = self.model.NewIntVar(first_slot, last_slot, f"task_{task.id}_slot")
+            present = self.model.NewBoolVar(f"task_{task.id}_present")
+            start = slot_var * self.slot_duration
+            intervals.append(self.model.NewOptionalIntervalVar(
+                start, task.duration_min, start + task.duration_min, present, f"task_{task.id}"
+            ))
+            task_slots[task.id] = slot_var
+            task_present[task.id] = present
+        
+        self.model.AddNoOverlap(intervals + fixed_intervals)
+        return task_slots, task_present
     
-    def _add_objective(self, task_vars, tasks, slots, prefs):
-        objective_terms = []
+    def _add_hints(self, task_slots, task_present, previous_solution, start_time, tz):
+        # Seed the search with the last plan (task id -> previous start_dt) so
+        # re-planning after a small change becomes a local repair.
+        for task_id, start_dt in previous_solution.items():
+            if task_id in task_slots:
+                self.model.AddHint(task_slots[task_id], self._minute_offset(start_dt, start_time, tz) // self.slot_duration)
+                self.model.AddHint(task_present[task_id], 1)
+        self.solver.parameters.repair_hint = True
+    
+    def _add_objective(self, task_slots, task_present, tasks, slots, prefs):
+        profile = np.array([prefs.energy_profile_by_hour.get(f"{hour:02d}:00", 0.5) for hour in range(24)])
+        hours = np.array([slot.hour for slot in slots], dtype=np.int64)
+        energy_mult = profile[hours]
+        hour_mask = np.where((hours < 9) | (hours > 18), 0.1, 1.0)
         
+        # Placing a task is worth more than any choice of slot (priority * 1000
+        # vs at most priority * 100); the slot score only counts when present.
+        obj_vars = []
+        obj_coeffs = []
         for task in tasks:
-            for i, slot in enumerate(slots):
-                if task_vars[task.id][i] in self.model.GetOrMakeIndex():
-                    score = task.priority * 100
-                    
-                    hour = slot.hour
-                    energy_multiplier = prefs.energy_profile_by_hour.get(f"{hour:02d}:00", 0.5)
-                    if task.energy == 'deep':
-                        score *= energy_multiplier
-                    
-                    if hour < 9 or hour > 18:
-                        score *= 0.1
-                    
-                    objective_terms.append(score * task_vars[task.id][i])
-        
-        self.model.Maximize(sum(objective_terms))
+            if task.id not in task_slots:
+                continue
+            
+            coeffs = task.priority * 100 * hour_mask
+            if task.energy == 'deep':
+                coeffs = coeffs * energy_mult
+            energy_table = np.rint(coeffs).astype(np.int64).tolist()
+            low, high = min(0, min(energy_table)), max(0, max(energy_table))
+            present = task_present[task.id]
+            
+            slot_score = self.model.NewIntVar(low, high, f"task_{task.id}_slot_score")
+            self.model.AddElement(task_slots[task.id], energy_table, slot_score)
+            score_var = self.model.NewIntVar(low, high, f"task_{task.id}_score")
+            self.model.Add(score_var == slot_score).OnlyEnforceIf(present)
+            self.model.Add(score_var == 0).OnlyEnforceIf(present.Not())
+            
+            obj_vars += [score_var, present]
+            obj_coeffs += [1, int(round(task.priority * 1000))]
+        
+        self.model.Maximize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_coeffs))
     
-    def _extract_solution(self, task_vars, tasks, slots, tz):
+    def _extract_solution(self, task_slots, task_present, tasks, slots):
         proposed_events = []
         unscheduled = []
         
         for task in tasks:
-            scheduled_slots = []
-            for i, slot in enumerate(slots):
-                if self.solver.Value(task_vars[task.id][i]):
-                    scheduled_slots.append(i)
-            
-            if scheduled_slots:
-                start_slot = min(scheduled_slots)
-                end_slot = max(scheduled_slots)
-                
-                start_time = slots[start_slot]
-                end_time = slots[end_slot] + timedelta(minutes=self.slot_duration)
-                
-                proposed_events.append(ProposedEvent(
-                    task_id=task.id,
-                    title=task.title,
-                    start_dt=start_time.isoformat(),
-                    end_dt=end_time.isoformat(),
-                    reason=f"Scheduled {task.energy} work"
-                ))
-            else:
+            if task.id not in task_present or not self.solver.Value(task_present[task.id]):
                 unscheduled.append(task.title)
+                continue
+            
+            start_time = slots[self.solver.Value(task_slots[task.id])]
+            end_time = start_time + timedelta(minutes=task.duration_min)
+            
+            proposed_events.append(ProposedEvent(
+                task_id=task.id,
+                title=task.title,
+                start_dt=start_time.isoformat(),
+                end_dt=end_time.isoformat(),
+                reason=f"Scheduled {task.energy} work"
+            ))
         
         return SolveResponse(
             proposed_events=proposed_events,
@@ -1,18 +1,33 @@
-from typing import List, Dict, Any, Optional, NamedTuple
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import functools
+import math
+import os
+import numpy as np
 import pytz
 from ortools.sat.python import cp_model
 import logging
 
 logger = logging.getLogger(__name__)
 
-class SolverInput(NamedTuple):
+# Tardy-allowed tasks lose this many objective points per hour past due_at;
+# a priority-0.5 task (500 points) is still worth scheduling 2.5 hours late
+LATENESS_PENALTY_PER_HOUR = 200
+
+@functools.lru_cache(maxsize=64)
+def _parse_hm(value: str):
+    return datetime.strptime(value, "%H:%M").time()
+
+@dataclass(slots=True, frozen=True)
+class SolverInput:
     date: str
     tasks: List[Dict[str, Any]]
     fixed_events: List[Dict[str, str]]
     preferences: Dict[str, Any]
 
-class SolverOutput(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class SolverOutput:
     success: bool
     scheduled_blocks: List[Dict[str, Any]]
     unscheduled_tasks: List[str]
@@ -20,9 +35,25 @@ class SolverOutput(NamedTuple):
     messages: List[str]
 
 class TaskScheduler:
-    def __init__(self, slot_minutes: int = 15, timezone: str = "Europe/London"):
+    def __init__(self, slot_minutes: int = 15, timezone: str = "Europe/London",
+                 num_workers: Optional[int] = None, probing_level: int = 1,
+                 linearization_level: int = 1, log_search_progress: bool = False):
         self.slot_minutes = slot_minutes
         self.timezone = pytz.timezone(timezone)
+        # localize() walks the zone's DST transitions; plan days repeat the same wall times
+        self._localize = functools.lru_cache(maxsize=256)(self.timezone.localize)
+        self.num_workers = num_workers or min(8, os.cpu_count() or 1)
+        self.probing_level = probing_level
+        self.linearization_level = linearization_level
+        self.log_search_progress = log_search_progress
+
+    def _slot_granularity(self, minute_values: List[int]) -> int:
+        """Largest slot size in [5, 30] minutes that divides every value, else the default."""
+        g = functools.reduce(math.gcd, minute_values, 0)
+        for size in range(min(30, g), 4, -1):
+            if g % size == 0:
+                return size
+        return self.slot_minutes
 
     def solve(self, input_data: SolverInput) -> SolverOutput:
         """
@@ -49,60 +80,77 @@ class TaskScheduler:
             prefs = input_data.preferences
 
             # Create timezone-aware datetime objects for work hours
-            work_start_time = datetime.combine(
-                target_date,
-                datetime.strptime(prefs["work_start"], "%H:%M").time()
-            )
-            work_start = self.timezone.localize(work_start_time)
-
-            work_end_time = datetime.combine(
-                target_date,
-                datetime.strptime(prefs["work_end"], "%H:%M").time()
-            )
-            work_end = self.timezone.localize(work_end_time)
+            work_start = self._localize(datetime.combine(target_date, _parse_hm(prefs["work_start"])))
+            work_end = self._localize(datetime.combine(target_date, _parse_hm(prefs["work_end"])))
 
             if prefs.get("allow_overtime", False):
                 work_end += timedelta(minutes=prefs.get("max_overtime_minutes", 120))
 
-            # Calculate total work minutes and slots
+            # Parse each ISO string once per solve; the cache lives with this work_start
+            @functools.lru_cache(maxsize=None)
+            def to_local(iso_str: str) -> datetime:
+                dt = datetime.fromisoformat(iso_str)
+                if dt.tzinfo is None:
+                    dt = self._localize(dt)
+                return dt
+
+            def to_minutes(iso_str: str) -> int:
+                return int((to_local(iso_str) - work_start).total_seconds() // 60)
+
+            def to_slot(iso_str: str) -> int:
+                return to_minutes(iso_str) // slot_minutes
+
+            # Calculate total work minutes
             total_minutes = int((work_end - work_start).total_seconds() / 60)
-            total_slots = total_minutes // self.slot_minutes
+
+            # Pick the coarsest slot that still lines up with the day, every
+            # duration, every task window and every event
+            slot_minutes = self._slot_granularity(
+                [total_minutes, prefs.get("buffer_minutes", 15)]
+                + [t["estimated_minutes"] for t in input_data.tasks]
+                + [
+                    to_minutes(t[key])
+                    for t in input_data.tasks
+                    for key in ("start_after", "due_at")
+                    if t.get(key)
+                ]
+                + [
+                    to_minutes(e[key])
+                    for e in input_data.fixed_events
+                    for key in ("start", "end")
+                ]
+            )
+            total_slots = total_minutes // slot_minutes
 
             if total_slots <= 0:
                 return SolverOutput(False, [], [t["id"] for t in input_data.tasks],
                                     {"reason": "invalid_work_hours"},
                                     ["Invalid work hours configuration"])
 
-            # Create CP-SAT model
-            model = cp_model.CpModel()
+            # Process tasks as columns; a due slot of total_slots means "no deadline today"
+            raw_tasks = input_data.tasks
+            estimated = np.array([t["estimated_minutes"] for t in raw_tasks], dtype=np.int64)
+            durations = np.maximum(1, -(-estimated // slot_minutes))  # round up
+            earliest_slots = np.maximum(0, -(-np.array(
+                [to_minutes(t["start_after"]) if t.get("start_after") else 0 for t in raw_tasks],
+                dtype=np.int64
+            ) // slot_minutes))  # round up: never start before start_after
+            due_slots = np.array(
+                [to_slot(t["due_at"]) if t.get("due_at") else total_slots for t in raw_tasks],
+                dtype=np.int64
+            )
+            # Tardy-allowed tasks keep the whole day; their deadline becomes a penalty
+            allow_tardy = np.array([bool(t.get("allow_tardy", False)) for t in raw_tasks], dtype=np.bool_)
+            latest_start_slots = np.where(allow_tardy, total_slots, np.minimum(total_slots, due_slots)) - durations
+            window_fits = (earliest_slots <= latest_start_slots) & (latest_start_slots >= 0)
 
-            # Process tasks
             tasks = []
-            for task in input_data.tasks:
-                # Convert estimated minutes to slots (round up)
-                duration_slots = max(1, (task["estimated_minutes"] + self.slot_minutes - 1) // self.slot_minutes)
-
-                # Calculate time windows
-                earliest_slot = 0
-                latest_start_slot = total_slots - duration_slots
-
-                if task.get("start_after"):
-                    start_after = datetime.fromisoformat(task["start_after"])
-                    if start_after.tzinfo is None:
-                        start_after = self.timezone.localize(start_after)
-                    if start_after > work_start:
-                        earliest_slot = max(0, int((start_after - work_start).total_seconds() / 60) // self.slot_minutes)
-
-                if task.get("due_at"):
-                    due_at = datetime.fromisoformat(task["due_at"])
-                    if due_at.tzinfo is None:
-                        due_at = self.timezone.localize(due_at)
-                    if due_at < work_end:
-                        latest_deadline_slot = int((due_at - work_start).total_seconds() / 60) // self.slot_minutes
-                        latest_start_slot = min(latest_start_slot, latest_deadline_slot - duration_slots)
-
+            for task, fit, duration_slots, earliest_slot, latest_start_slot, due_slot in zip(
+                raw_tasks, window_fits.tolist(), durations.tolist(), earliest_slots.tolist(),
+                latest_start_slots.tolist(), due_slots.tolist()
+            ):
                 # Skip tasks that can't fit
-                if earliest_slot > latest_start_slot or latest_start_slot < 0:
+                if not fit:
                     messages.append(f"Task '{task['title']}' cannot fit in schedule")
                     continue
 
@@ -110,7 +158,8 @@ class TaskScheduler:
                     **task,
                     "duration_slots": duration_slots,
                     "earliest_slot": earliest_slot,
-                    "latest_start_slot": latest_start_slot
+                    "latest_start_slot": latest_start_slot,
+                    "_due_slot": due_slot
                 })
 
             if not tasks:
@@ -119,215 +168,253 @@ class TaskScheduler:
                                     ["No tasks can be scheduled"])
 
             # Process fixed events to get blocked slots
-            blocked_slots = set()
+            blocked_mask = np.zeros(total_slots, dtype=np.bool_)
             for event in input_data.fixed_events:
-                event_start = datetime.fromisoformat(event["start"])
-                event_end = datetime.fromisoformat(event["end"])
-
-                if event_start.tzinfo is None:
-                    event_start = self.timezone.localize(event_start)
-                if event_end.tzinfo is None:
-                    event_end = self.timezone.localize(event_end)
+                event_start = to_local(event["start"])
+                event_end = to_local(event["end"])
 
                 # Find overlapping slots
                 if event_end > work_start and event_start < work_end:
-                    start_slot = max(0, int((event_start - work_start).total_seconds() / 60) // self.slot_minutes)
-                    end_slot = min(total_slots, (int((event_end - work_start).total_seconds() / 60) + self.slot_minutes - 1) // self.slot_minutes)
-
-                    for slot in range(start_slot, end_slot):
-                        blocked_slots.add(slot)
-
-            # Create decision variables
-            task_vars = {}
-            task_scheduled = {}
-
-            for task in tasks:
-                task_id = task["id"]
-                # Start time variable (slot index)
-                start_var = model.NewIntVar(
-                    task["earliest_slot"],
-                    task["latest_start_slot"],
-                    f"start_{task_id}"
-                )
-                # Scheduled boolean variable
-                scheduled_var = model.NewBoolVar(f"scheduled_{task_id}")
-
-                task_vars[task_id] = start_var
-                task_scheduled[task_id] = scheduled_var
-
-            # Constraint: No overlapping tasks
-            for i, task_a in enumerate(tasks):
-                for j, task_b in enumerate(tasks[i+1:], i+1):
-                    task_a_id = task_a["id"]
-                    task_b_id = task_b["id"]
-
-                    # If both tasks are scheduled, they must not overlap
-                    # Task A ends before Task B starts OR Task B ends before Task A starts
-                    overlap_constraint = model.NewBoolVar(f"no_overlap_{task_a_id}_{task_b_id}")
-
-                    # Task A before Task B
-                    model.Add(
-                        task_vars[task_a_id] + task_a["duration_slots"] + 1 <= task_vars[task_b_id]
-                    ).OnlyEnforceIf([task_scheduled[task_a_id], task_scheduled[task_b_id], overlap_constraint])
-
-                    # Task B before Task A
-                    model.Add(
-                        task_vars[task_b_id] + task_b["duration_slots"] + 1 <= task_vars[task_a_id]
-                    ).OnlyEnforceIf([task_scheduled[task_a_id], task_scheduled[task_b_id], overlap_constraint.Not()])
-
-                    # At least one must be true if both scheduled
-                    model.AddImplication(
-                        task_scheduled[task_a_id].And(task_scheduled[task_b_id]),
-                        overlap_constraint.Or(overlap_constraint.Not())
+                    start_slot = max(0, int((event_start - work_start).total_seconds() / 60) // slot_minutes)
+                    end_slot = min(total_slots, (int((event_end - work_start).total_seconds() / 60) + slot_minutes - 1) // slot_minutes)
+                    blocked_mask[start_slot:end_slot] = True
+
+            # Greedy earliest-deadline-first placement: the CP-SAT warm start, and
+            # the answer itself for a lone task (every objective term favours the
+            # earliest fitting start)
+            # Round the buffer up to whole slots, so the gap between tasks never
+            # shrinks below buffer_minutes nor grows with the slot size (0 means none)
+            buffer_slots = -(-max(0, prefs.get("buffer_minutes", 15)) // slot_minutes)
+            greedy_starts = {}
+            blocked_count = np.concatenate(([0], np.cumsum(blocked_mask)))
+            task_occupied = np.zeros(total_slots + buffer_slots, dtype=np.bool_)
+            for task in sorted(tasks, key=lambda t: (
+                t["_due_slot"],
+                -t.get("priority", 0.5)
+            )):
+                # The task itself must avoid fixed events; task plus buffer must
+                # avoid earlier tasks (and their buffers)
+                duration = task["duration_slots"]
+                width = duration + buffer_slots
+                task_count = np.concatenate(([0], np.cumsum(task_occupied)))
+                first, last = task["earliest_slot"], task["latest_start_slot"]
+                clear_of_events = blocked_count[first + duration:last + duration + 1] == blocked_count[first:last + 1]
+                clear_of_tasks = task_count[first + width:last + width + 1] == task_count[first:last + 1]
+                free_starts = np.flatnonzero(clear_of_events & clear_of_tasks)
+
+                if free_starts.size:
+                    greedy_start = first + int(free_starts[0])
+                    task_occupied[greedy_start:greedy_start + width] = True
+                    greedy_starts[task["id"]] = greedy_start
+                else:
+                    greedy_starts[task["id"]] = None
+
+            # A lone on-time task with positive priority is always worth placing,
+            # and no objective term can prefer a later start than the greedy one
+            lone_start = greedy_starts[tasks[0]["id"]] if len(tasks) == 1 else None
+            if len(tasks) == 1 and tasks[0].get("priority", 0.5) > 0 and (
+                lone_start is None
+                or lone_start + tasks[0]["duration_slots"] <= tasks[0]["_due_slot"]
+            ):
+                start_slots = greedy_starts
+                solver_status, solve_time = "OPTIMAL", 0.0
+            else:
+                model = cp_model.CpModel()
+
+                # Create decision variables. Each task gets two optional intervals on
+                # the same start: one padded with the buffer, kept apart from the other
+                # tasks, and one of the bare duration, kept clear of fixed events (a
+                # task may end right as a meeting starts).
+                task_vars = {}
+                task_scheduled = {}
+                buffered_intervals = []
+                event_intervals = []
+
+                for task in tasks:
+                    task_id = task["id"]
+                    # Start time variable (slot index)
+                    start_var = model.NewIntVar(
+                        task["earliest_slot"],
+                        task["latest_start_slot"],
+                        f"start_{task_id}"
                     )
-
-            # Constraint: Avoid blocked slots (fixed events)
-            for task in tasks:
-                task_id = task["id"]
-                for slot in blocked_slots:
-                    for task_slot_offset in range(task["duration_slots"]):
-                        # If task is scheduled and occupies this slot, constraint violated
-                        slot_conflict = model.NewBoolVar(f"conflict_{task_id}_{slot}_{task_slot_offset}")
+                    # Scheduled boolean variable
+                    scheduled_var = model.NewBoolVar(f"scheduled_{task_id}")
+
+                    buffered_intervals.append(model.NewOptionalIntervalVar(
+                        start_var,
+                        task["duration_slots"] + buffer_slots,
+                        start_var + task["duration_slots"] + buffer_slots,
+                        scheduled_var,
+                        f"iv_{task_id}"
+                    ))
+                    event_intervals.append(model.NewOptionalIntervalVar(
+                        start_var,
+                        task["duration_slots"],
+                        start_var + task["duration_slots"],
+                        scheduled_var,
+                        f"task_{task_id}"
+                    ))
+                    task_vars[task_id] = start_var
+                    task_scheduled[task_id] = scheduled_var
+
+                # Fixed events: coalesce blocked slots into runs, one fixed interval each
+                edges = np.diff(blocked_mask.astype(np.int8), prepend=0, append=0)
+                run_starts = np.flatnonzero(edges == 1).tolist()
+                run_ends = np.flatnonzero(edges == -1).tolist()
+
+                for i, (start_slot, end_slot) in enumerate(zip(run_starts, run_ends)):
+                    event_intervals.append(model.NewIntervalVar(
+                        model.NewConstant(start_slot),
+                        end_slot - start_slot,
+                        model.NewConstant(end_slot),
+                        f"blk_{i}"
+                    ))
+
+                # Constraint: No overlapping tasks (buffer included), and no task
+                # over a fixed event. A capacity-1 cumulative is the same constraint
+                # with different propagators, which can be faster on some shapes.
+                for intervals in (buffered_intervals, event_intervals):
+                    if prefs.get("use_cumulative", False):
+                        model.AddCumulative(intervals, [1] * len(intervals), 1)
+                    else:
+                        model.AddNoOverlap(intervals)
+
+                # Warm start from the greedy placement
+                for task_id, greedy_start in greedy_starts.items():
+                    if greedy_start is None:
+                        model.AddHint(task_scheduled[task_id], 0)
+                    else:
+                        model.AddHint(task_vars[task_id], greedy_start)
+                        model.AddHint(task_scheduled[task_id], 1)
+
+                # Objective function
+                obj_vars = []
+                obj_coeffs = []
+
+                # Maximize scheduled high-priority tasks
+                for task in tasks:
+                    priority_weight = int(task.get("priority", 0.5) * 1000)  # Scale for integer optimization
+                    obj_vars.append(task_scheduled[task["id"]])
+                    obj_coeffs.append(priority_weight)
+
+                # Deep work morning preference
+                morning_end_slot = min(total_slots, 4 * 60 // slot_minutes)  # First 4 hours, whatever the slot size
+                deep_work_weight = int(prefs.get("deep_work_morning", 0.6) * 500)
+
+                for task in tasks:
+                    if task.get("task_type") == "deep_work" or task.get("priority", 0.5) > 0.8:
+                        # Window entirely inside / outside the morning: no reification needed
+                        if task["latest_start_slot"] + task["duration_slots"] <= morning_end_slot:
+                            obj_vars.append(task_scheduled[task["id"]])
+                            obj_coeffs.append(deep_work_weight)
+                            continue
+                        if task["earliest_slot"] + task["duration_slots"] > morning_end_slot:
+                            continue
+
+                        # Bonus for scheduling in morning
+                        morning_bonus = model.NewBoolVar(f"morning_{task['id']}")
                         model.Add(
-                            task_vars[task_id] + task_slot_offset == slot
-                        ).OnlyEnforceIf([task_scheduled[task_id], slot_conflict])
-
-                        model.Add(slot_conflict == 0)  # Forbid conflicts
-
-            # Buffer constraint: Add buffer between consecutive tasks
-            buffer_slots = max(1, prefs.get("buffer_minutes", 15) // self.slot_minutes)
-
-            for i, task_a in enumerate(tasks):
-                for j, task_b in enumerate(tasks[i+1:], i+1):
-                    task_a_id = task_a["id"]
-                    task_b_id = task_b["id"]
-
-                    # If Task A comes before Task B, ensure buffer
-                    buffer_constraint = model.NewBoolVar(f"buffer_{task_a_id}_{task_b_id}")
-                    model.Add(
-                        task_vars[task_a_id] + task_a["duration_slots"] + buffer_slots <= task_vars[task_b_id]
-                    ).OnlyEnforceIf([task_scheduled[task_a_id], task_scheduled[task_b_id], buffer_constraint])
-
-                    # Similar constraint for reverse order
-                    buffer_constraint_rev = model.NewBoolVar(f"buffer_{task_b_id}_{task_a_id}")
-                    model.Add(
-                        task_vars[task_b_id] + task_b["duration_slots"] + buffer_slots <= task_vars[task_a_id]
-                    ).OnlyEnforceIf([task_scheduled[task_a_id], task_scheduled[task_b_id], buffer_constraint_rev])
-
-                    # One must be true if both are scheduled
-                    model.AddImplication(
-                        task_scheduled[task_a_id].And(task_scheduled[task_b_id]),
-                        buffer_constraint.Or(buffer_constraint_rev)
-                    )
-
-            # Objective function
-            objective_terms = []
-
-            # Maximize scheduled high-priority tasks
-            for task in tasks:
-                priority_weight = int(task.get("priority", 0.5) * 1000)  # Scale for integer optimization
-                objective_terms.append(task_scheduled[task["id"]] * priority_weight)
-
-            # Deep work morning preference
-            morning_end_slot = min(total_slots, 4 * 60 // self.slot_minutes)  # First 4 hours
-            deep_work_weight = int(prefs.get("deep_work_morning", 0.6) * 500)
-
-            for task in tasks:
-                if task.get("task_type") == "deep_work" or task.get("priority", 0.5) > 0.8:
-                    # Bonus for scheduling in morning
-                    morning_bonus = model.NewBoolVar(f"morning_{task['id']}")
-                    model.Add(
-                        task_vars[task["id"]] + task["duration_slots"] <= morning_end_slot
-                    ).OnlyEnforceIf([task_scheduled[task["id"]], morning_bonus])
-
-                    objective_terms.append(morning_bonus * deep_work_weight)
-
-            # Penalty for tardiness (scheduling past due date)
-            for task in tasks:
-                if task.get("due_at"):
-                    due_at = datetime.fromisoformat(task["due_at"])
-                    if due_at.tzinfo is None:
-                        due_at = self.timezone.localize(due_at)
-
-                    due_slot = int((due_at - work_start).total_seconds() / 60) // self.slot_minutes
-                    if due_slot < total_slots:
-                        tardiness_penalty = model.NewBoolVar(f"tardiness_{task['id']}")
+                            task_vars[task["id"]] <= morning_end_slot - task["duration_slots"]
+                        ).OnlyEnforceIf(morning_bonus)
+                        model.AddImplication(morning_bonus, task_scheduled[task["id"]])
+
+                        obj_vars.append(morning_bonus)
+                        obj_coeffs.append(deep_work_weight)
+
+                # Penalty for tardiness (slots past due date). Only tardy-allowed tasks
+                # can end after due_at; everything else is capped by latest_start_slot.
+                # Lateness only counts once the task is scheduled, and costs less than
+                # the task is worth, so a late task still beats a dropped one.
+                for task in tasks:
+                    due_slot = task["_due_slot"]
+                    if task.get("allow_tardy", False) and due_slot < total_slots:
+                        max_lateness = task["latest_start_slot"] + task["duration_slots"] - due_slot
+                        if max_lateness <= 0:
+                            continue  # Window ends before due_at: can never be late
+                        lateness = model.NewIntVar(0, max_lateness, f"lateness_{task['id']}")
                         model.Add(
-                            task_vars[task["id"]] + task["duration_slots"] > due_slot
-                        ).OnlyEnforceIf([task_scheduled[task["id"]], tardiness_penalty])
-
-                        objective_terms.append(tardiness_penalty * -2000)  # High penalty
-
-            model.Maximize(sum(objective_terms))
-
-            # Solve
-            solver = cp_model.CpSolver()
-            solver.parameters.max_time_in_seconds = 30.0  # 30 second timeout
-
-            status = solver.Solve(model)
-
-            if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-                return SolverOutput(False, [], [t["id"] for t in tasks],
-                                    {"solver_status": solver.StatusName(status)},
-                                    [f"Solver failed: {solver.StatusName(status)}"])
-
-            # Extract solution
-            scheduled_blocks = []
+                            lateness >= task_vars[task["id"]] + (task["duration_slots"] - due_slot)
+                        ).OnlyEnforceIf(task_scheduled[task["id"]])
+
+                        obj_vars.append(lateness)
+                        obj_coeffs.append(-(LATENESS_PENALTY_PER_HOUR * slot_minutes // 60))
+
+                model.Maximize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_coeffs))
+
+                # Solve
+                solver = cp_model.CpSolver()
+                solver.parameters.max_time_in_seconds = 30.0  # 30 second timeout
+                solver.parameters.repair_hint = True
+                solver.parameters.num_search_workers = self.num_workers
+                solver.parameters.log_search_progress = self.log_search_progress
+                solver.parameters.cp_model_probing_level = self.probing_level
+                solver.parameters.linearization_level = self.linearization_level
+
+                status = solver.Solve(model)
+
+                if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                    return SolverOutput(False, [], [t["id"] for t in tasks],
+                                        {"solver_status": solver.StatusName(status)},
+                                        [f"Solver failed: {solver.StatusName(status)}"])
+
+                start_slots = {
+                    task["id"]: solver.Value(task_vars[task["id"]]) if solver.Value(task_scheduled[task["id"]]) else None
+                    for task in tasks
+                }
+                solver_status, solve_time = solver.StatusName(status), solver.WallTime()
+
+            # Extract solution as (start_slot, task, start_dt, end_dt), in slot order
+            placements = []
             unscheduled_tasks = []
+            total_scheduled_minutes = 0
 
             for task in tasks:
                 task_id = task["id"]
-                if solver.Value(task_scheduled[task_id]):
-                    start_slot = solver.Value(task_vars[task_id])
-                    start_time = work_start + timedelta(minutes=start_slot * self.slot_minutes)
-                    end_time = start_time + timedelta(minutes=task["duration_slots"] * self.slot_minutes)
-
-                    scheduled_blocks.append({
-                        "task_id": task_id,
-                        "title": task["title"],
-                        "start": start_time.isoformat(),
-                        "end": end_time.isoformat(),
-                        "block_type": "task",
-                        "confidence": 1.0
-                    })
+                start_slot = start_slots[task_id]
+                if start_slot is not None:
+                    start_time = work_start + timedelta(minutes=start_slot * slot_minutes)
+                    end_time = start_time + timedelta(minutes=task["duration_slots"] * slot_minutes)
+                    placements.append((start_slot, task, start_time, end_time))
+                    total_scheduled_minutes += task["duration_slots"] * slot_minutes
                 else:
                     unscheduled_tasks.append(task_id)
 
-            # Sort blocks by start time
-            scheduled_blocks.sort(key=lambda x: x["start"])
+            placements.sort(key=lambda x: x[0])
 
-            # Add buffer blocks
-            buffer_blocks = []
+            # Emit task blocks in order, with a buffer block after each task that
+            # has room for one before the next
+            all_blocks = []
             buffer_minutes = prefs.get("buffer_minutes", 15)
 
-            for i in range(len(scheduled_blocks) - 1):
-                current_end = datetime.fromisoformat(scheduled_blocks[i]["end"])
-                next_start = datetime.fromisoformat(scheduled_blocks[i + 1]["start"])
-
-                gap_minutes = (next_start - current_end).total_seconds() / 60
-                if gap_minutes >= buffer_minutes:
-                    buffer_end = current_end + timedelta(minutes=buffer_minutes)
-                    buffer_blocks.append({
-                        "title": "Buffer",
-                        "start": current_end.isoformat(),
-                        "end": buffer_end.isoformat(),
-                        "block_type": "buffer",
-                        "confidence": 0.8
-                    })
+            for i, (_, task, start_time, end_time) in enumerate(placements):
+                all_blocks.append({
+                    "task_id": task["id"],
+                    "title": task["title"],
+                    "start": start_time.isoformat(),
+                    "end": end_time.isoformat(),
+                    "block_type": "task",
+                    "confidence": 1.0
+                })
 
-            all_blocks = scheduled_blocks + buffer_blocks
-            all_blocks.sort(key=lambda x: x["start"])
+                if i + 1 < len(placements):
+                    gap_minutes = (placements[i + 1][2] - end_time).total_seconds() / 60
+                    if buffer_minutes > 0 and gap_minutes >= buffer_minutes:
+                        all_blocks.append({
+                            "title": "Buffer",
+                            "start": all_blocks[-1]["end"],
+                            "end": (end_time + timedelta(minutes=buffer_minutes)).isoformat(),
+                            "block_type": "buffer",
+                            "confidence": 0.8
+                        })
 
             stats = {
                 "total_tasks": len(input_data.tasks),
-                "scheduled_tasks": len(scheduled_blocks),
+                "scheduled_tasks": len(placements),
                 "unscheduled_tasks": len(unscheduled_tasks),
-                "total_scheduled_minutes": sum(
-                    (datetime.fromisoformat(b["end"]) - datetime.fromisoformat(b["start"])).total_seconds() / 60
-                    for b in scheduled_blocks
-                ),
-                "solver_status": solver.StatusName(status),
-                "solve_time_seconds": solver.WallTime()
+                "total_scheduled_minutes": total_scheduled_minutes,
+                "solver_status": solver_status,
+                "solve_time_seconds": solve_time
             }
 
             return SolverOutput(
@@ -1,10 +1,29 @@
 import pytest
 from datetime import datetime, timedelta
 from main import TaskScheduler, Task, FixedEvent, Preferences
+from solver_engine import TaskScheduler as EngineScheduler, SolverInput
 
-def test_solver_basic():
+@pytest.fixture(scope="module")
+def scheduler():
+    return TaskScheduler()
+
+def make_prefs(**overrides):
+    """Monday 09:00-17:00 preferences, with any field overridden"""
+    prefs = dict(
+        work_hours_by_day={"monday": "09:00-17:00"},
+        buffer_min=15,
+        meeting_gap_min=10,
+        sleep_window="22:00-07:00",
+        travel_speed_kmh=5,
+        energy_profile_by_hour={},
+        avoid_times=[],
+        weights={}
+    )
+    prefs.update(overrides)
+    return Preferences(**prefs)
+
+def test_solver_basic(scheduler):
     """Test basic solver functionality with simple scenario"""
-    scheduler = TaskScheduler()
     
     tasks = [
         Task(
@@ -33,7 +52,7 @@ def test_solver_basic():
         )
     ]
     
-    prefs = Preferences(
+    prefs = make_prefs(
         work_hours_by_day={
             "monday": "09:00-18:00",
             "tuesday": "09:00-18:00",
@@ -41,10 +60,6 @@ def test_solver_basic():
             "thursday": "09:00-18:00",
             "friday": "09:00-18:00"
         },
-        buffer_min=15,
-        meeting_gap_min=10,
-        sleep_window="22:00-07:00",
-        travel_speed_kmh=5,
         energy_profile_by_hour={
             "09:00": 0.8,
             "10:00": 0.9,
@@ -56,9 +71,7 @@ def test_solver_basic():
             "16:00": 0.8,
             "17:00": 0.7,
             "18:00": 0.6
-        },
-        avoid_times=[],
-        weights={}
+        }
     )
     
     result = scheduler.solve(
@@ -66,16 +79,16 @@ def test_solver_basic():
         fixed_events=fixed_events,
         prefs=prefs,
         date="2024-01-15",
-        timezone="Europe/London"
+        timezone="Europe/London",
+        max_seconds=2.0
     )
     
     assert result is not None
     assert len(result.proposed_events) >= 0
     assert len(result.unscheduled) >= 0
 
-def test_solver_constraints():
+def test_solver_constraints(scheduler):
     """Test that solver respects work hours and fixed events"""
-    scheduler = TaskScheduler()
     
     tasks = [
         Task(
@@ -97,23 +110,15 @@ def test_solver_constraints():
         )
     ]
     
-    prefs = Preferences(
-        work_hours_by_day={"monday": "09:00-17:00"},
-        buffer_min=15,
-        meeting_gap_min=10,
-        sleep_window="22:00-07:00",
-        travel_speed_kmh=5,
-        energy_profile_by_hour={"10:00": 0.9, "11:00": 0.9},
-        avoid_times=[],
-        weights={}
-    )
+    prefs = make_prefs(energy_profile_by_hour={"10:00": 0.9, "11:00": 0.9})
     
     result = scheduler.solve(
         tasks=tasks,
         fixed_events=fixed_events,
         prefs=prefs,
         date="2024-01-15",
-        timezone="Europe/London"
+        timezone="Europe/London",
+        max_seconds=2.0
     )
     
     assert result is not None
@@ -130,9 +135,8 @@ def test_solver_constraints():
             # No overlap
             assert not (event_start < fixed_end and event_end > fixed_start)
 
-def test_solver_after_hours_penalty():
+def test_solver_after_hours_penalty(scheduler):
     """Test that solver penalizes after-hours scheduling"""
-    scheduler = TaskScheduler()
     
     tasks = [
         Task(
@@ -144,23 +148,15 @@ def test_solver_after_hours_penalty():
         )
     ]
     
-    prefs = Preferences(
-        work_hours_by_day={"monday": "09:00-17:00"},
-        buffer_min=15,
-        meeting_gap_min=10,
-        sleep_window="22:00-07:00",
-        travel_speed_kmh=5,
-        energy_profile_by_hour={},
-        avoid_times=[],
-        weights={}
-    )
+    prefs = make_prefs()
     
     result = scheduler.solve(
         tasks=tasks,
         fixed_events=[],
         prefs=prefs,
         date="2024-01-15",
-        timezone="Europe/London"
+        timezone="Europe/London",
+        max_seconds=2.0
     )
     
     assert result is not None
@@ -174,9 +170,8 @@ def test_solver_after_hours_penalty():
         assert event_start.hour >= 9
         assert event_end.hour <= 17
 
-def test_solver_energy_preference():
+def test_solver_energy_preference(scheduler):
     """Test that solver considers energy preferences"""
-    scheduler = TaskScheduler()
     
     tasks = [
         Task(
@@ -188,18 +183,12 @@ def test_solver_energy_preference():
         )
     ]
     
-    prefs = Preferences(
+    prefs = make_prefs(
         work_hours_by_day={"monday": "09:00-18:00"},
-        buffer_min=15,
-        meeting_gap_min=10,
-        sleep_window="22:00-07:00",
-        travel_speed_kmh=5,
         energy_profile_by_hour={
             "10:00": 0.9,  # High energy morning
             "14:00": 0.3   # Low energy afternoon
-        },
-        avoid_times=[],
-        weights={}
+        }
     )
     
     result = scheduler.solve(
@@ -207,7 +196,8 @@ def test_solver_energy_preference():
         fixed_events=[],
         prefs=prefs,
         date="2024-01-15",
-        timezone="Europe/London"
+        timezone="Europe/London",
+        max_seconds=2.0
     )
     
     assert result is not None
@@ -219,5 +209,248 @@ def test_solver_energy_preference():
         assert event_start.hour >= 9
         assert event_start.hour <= 12
 
+def test_solver_tasks_do_not_overlap(scheduler):
+    """Test that scheduled tasks never overlap each other"""
+    
+    tasks = [
+        Task(id=1, title="Deep work", duration_min=90, priority=0.9, energy="deep"),
+        Task(id=2, title="Review", duration_min=45, priority=0.7, energy="deep"),
+        Task(id=3, title="Email", duration_min=30, priority=0.4, energy="light")
+    ]
+    
+    prefs = make_prefs(energy_profile_by_hour={"10:00": 0.9})
+    
+    result = scheduler.solve(
+        tasks=tasks,
+        fixed_events=[],
+        prefs=prefs,
+        date="2024-01-15",
+        timezone="Europe/London",
+        max_seconds=2.0
+    )
+    
+    assert len(result.proposed_events) == 3
+    
+    spans = sorted(
+        (datetime.fromisoformat(e.start_dt), datetime.fromisoformat(e.end_dt))
+        for e in result.proposed_events
+    )
+    for (_, prev_end), (next_start, _) in zip(spans, spans[1:]):
+        assert prev_end <= next_start
+
+def test_solver_overlapping_fixed_events(scheduler):
+    """Test that double-booked fixed events still leave the rest of the day usable"""
+    
+    tasks = [
+        Task(id=1, title="Write report", duration_min=60, priority=0.8, energy="light")
+    ]
+    
+    fixed_events = [
+        FixedEvent(id=1, start_dt="2024-01-15T09:00:00Z", end_dt="2024-01-15T10:30:00Z", title="Standup"),
+        FixedEvent(id=2, start_dt="2024-01-15T10:00:00Z", end_dt="2024-01-15T11:00:00Z", title="1:1")
+    ]
+    
+    prefs = make_prefs()
+    
+    result = scheduler.solve(
+        tasks=tasks,
+        fixed_events=fixed_events,
+        prefs=prefs,
+        date="2024-01-15",
+        timezone="Europe/London",
+        max_seconds=2.0
+    )
+    
+    assert len(result.proposed_events) == 1
+    assert datetime.fromisoformat(result.proposed_events[0].start_dt).hour >= 11
+
+def test_solver_previous_solution_hint(scheduler):
+    """Test that a previous plan can be passed back in as a warm start"""
+    
+    tasks = [
+        Task(id=1, title="Write report", duration_min=60, priority=0.8, energy="deep"),
+        Task(id=2, title="Call client", duration_min=30, priority=0.6, energy="light")
+    ]
+    
+    prefs = make_prefs(energy_profile_by_hour={"10:00": 0.9})
+    
+    first = scheduler.solve(
+        tasks=tasks,
+        fixed_events=[],
+        prefs=prefs,
+        date="2024-01-15",
+        timezone="Europe/London",
+        max_seconds=2.0
+    )
+    previous = {e.task_id: e.start_dt for e in first.proposed_events}
+    
+    result = scheduler.solve(
+        tasks=tasks,
+        fixed_events=[],
+        prefs=prefs,
+        date="2024-01-15",
+        timezone="Europe/London",
+        previous_solution=previous,
+        max_seconds=2.0
+    )
+    
+    assert len(result.proposed_events) == 2
+    assert result.total_score == first.total_score
+
+def test_solver_reports_task_that_cannot_fit(scheduler):
+    """Test that one task with an impossible window doesn't unschedule the rest"""
+    tasks = [
+        Task(id=1, title="Quick call", duration_min=30, priority=0.5, energy="light"),
+        Task(id=2, title="Too late", duration_min=60, priority=0.5, energy="light",
+             latest_end_dt="2024-01-15T09:30:00Z")
+    ]
+    
+    result = scheduler.solve(
+        tasks=tasks,
+        fixed_events=[],
+        prefs=make_prefs(),
+        date="2024-01-15",
+        timezone="Europe/London",
+        max_seconds=2.0
+    )
+    
+    assert [e.task_id for e in result.proposed_events] == [1]
+    assert result.unscheduled == ["Too late"]
+
+def test_solver_overfull_day(scheduler):
+    """Test that tasks exceeding the day's capacity are reported, not dropped wholesale"""
+    tasks = [
+        Task(id=i, title=f"Block {i}", duration_min=240, priority=0.5, energy="light")
+        for i in range(1, 4)
+    ]
+    
+    result = scheduler.solve(
+        tasks=tasks,
+        fixed_events=[],
+        prefs=make_prefs(),
+        date="2024-01-15",
+        timezone="Europe/London",
+        max_seconds=2.0
+    )
+    
+    assert len(result.proposed_events) == 2
+    assert len(result.unscheduled) == 1
+
+@pytest.fixture(scope="module")
+def engine():
+    return EngineScheduler()
+
+def engine_task(task_id, minutes, priority=0.5, **fields):
+    return dict(id=task_id, title=f"Task {task_id}", estimated_minutes=minutes, priority=priority, **fields)
+
+def engine_input(tasks, fixed_events=(), **prefs):
+    """Monday 09:00-17:00 engine input, with any preference overridden"""
+    preferences = {"work_start": "09:00", "work_end": "17:00", "buffer_minutes": 15}
+    preferences.update(prefs)
+    return SolverInput("2024-01-15", list(tasks), list(fixed_events), preferences)
+
+def test_engine_morning_bonus_requires_scheduling(engine):
+    """Test that a blocked morning can't earn the deep-work bonus for an unscheduled task"""
+    meeting = dict(start="2024-01-15T09:00:00", end="2024-01-15T13:00:00")
+    tasks = [
+        engine_task("deep", 60, priority=0.2, task_type="deep_work"),
+        engine_task("light", 60)
+    ]
+    
+    result = engine.solve(engine_input(tasks, [meeting]))
+    
+    assert result.success
+    assert result.unscheduled_tasks == []
+    assert {b["task_id"] for b in result.scheduled_blocks if b["block_type"] == "task"} == {"deep", "light"}
+
+def test_engine_task_can_end_as_meeting_starts(engine):
+    """Test that the between-task buffer isn't required before a fixed event"""
+    meeting = dict(start="2024-01-15T10:00:00", end="2024-01-15T16:00:00")
+    tasks = [
+        engine_task("report", 60, due_at="2024-01-15T10:00:00"),
+        engine_task("email", 30)
+    ]
+    
+    for use_cumulative in (False, True):
+        result = engine.solve(engine_input(tasks, [meeting], use_cumulative=use_cumulative))
+        
+        assert result.unscheduled_tasks == []
+        assert engine_task_starts(result)["report"] == "09:00"
+
+def engine_task_starts(result):
+    return {b["task_id"]: b["start"][11:16] for b in result.scheduled_blocks if b["block_type"] == "task"}
+
+def test_engine_tardy_task_scheduled_late(engine):
+    """Test that allow_tardy tasks can run past due_at, as early as the penalty can push them"""
+    meeting = dict(start="2024-01-15T09:00:00", end="2024-01-15T11:00:00")
+    tasks = [
+        engine_task("late", 60, due_at="2024-01-15T10:00:00", allow_tardy=True),
+        engine_task("other", 60, priority=0.6)
+    ]
+    
+    result = engine.solve(engine_input(tasks, [meeting]))
+    
+    assert result.unscheduled_tasks == []
+    assert engine_task_starts(result)["late"] == "11:00"
+    
+    strict = engine.solve(engine_input([{**tasks[0], "allow_tardy": False}, tasks[1]], [meeting]))
+    
+    assert "late" not in engine_task_starts(strict)
+
+def test_engine_cumulative_matches_no_overlap(engine):
+    """Test that the capacity-1 cumulative encoding finds the same optimum as NoOverlap"""
+    meetings = [
+        dict(start="2024-01-15T10:00:00", end="2024-01-15T11:00:00"),
+        dict(start="2024-01-15T14:00:00", end="2024-01-15T14:30:00")
+    ]
+    tasks = [
+        engine_task(f"t{i}", 30 + 15 * (i % 4), priority=0.1 * (i % 10),
+                    task_type="deep_work" if i % 3 == 0 else None)
+        for i in range(12)
+    ]
+    
+    no_overlap = engine.solve(engine_input(tasks, meetings))
+    cumulative = engine.solve(engine_input(tasks, meetings, use_cumulative=True))
+    
+    assert no_overlap.stats["solver_status"] == cumulative.stats["solver_status"] == "OPTIMAL"
+    assert sorted(no_overlap.unscheduled_tasks) == sorted(cumulative.unscheduled_tasks)
+    assert no_overlap.stats["total_scheduled_minutes"] == cumulative.stats["total_scheduled_minutes"]
+
+def test_engine_lone_task_matches_cp(engine):
+    """Test that the lone-task fast path places a task where CP-SAT would"""
+    meeting = dict(start="2024-01-15T09:00:00", end="2024-01-15T10:00:00")
+    deep = engine_task("deep", 90, priority=0.9, task_type="deep_work")
+    # A second task confined to the late afternoon forces the CP-SAT path
+    # without competing for the morning
+    filler = engine_task("filler", 30, priority=0.1, start_after="2024-01-15T16:00:00")
+    
+    lone = engine.solve(engine_input([deep], [meeting]))
+    with_cp = engine.solve(engine_input([deep, filler], [meeting]))
+    
+    assert lone.stats["solve_time_seconds"] == 0.0
+    assert engine_task_starts(lone)["deep"] == engine_task_starts(with_cp)["deep"] == "10:00"
+
+def test_engine_slot_granularity_respects_windows(engine):
+    """Test that coarse slots never move a task outside its start_after/due_at window"""
+    tasks = [
+        engine_task("a", 60, start_after="2024-01-15T09:15:00", due_at="2024-01-15T11:45:00"),
+        engine_task("b", 60)
+    ]
+    
+    result = engine.solve(engine_input(tasks, buffer_minutes=30))
+    
+    block = next(b for b in result.scheduled_blocks if b.get("task_id") == "a")
+    assert block["start"][11:16] >= "09:15"
+    assert block["end"][11:16] <= "11:45"
+
+def test_engine_zero_buffer_packs_tasks(engine):
+    """Test that buffer_minutes=0 lets tasks run back to back whatever the slot size"""
+    tasks = [engine_task(str(i), 60) for i in range(4)]
+    
+    result = engine.solve(engine_input(tasks, work_end="14:00", buffer_minutes=0))
+    
+    assert result.unscheduled_tasks == []
+    assert all(b["block_type"] == "task" for b in result.scheduled_blocks)
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file